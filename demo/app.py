@@ -9,7 +9,7 @@ This app is completely independent from any external project and showcases
 * Interactive D3.js diagram with all controls
 * Static Graphviz rendering (SVG / PNG)
 * Flask blueprint asset serving
-* DiagramConfig customisation + ``to_js_config()``
+* DiagramConfig customisation + ``to_js_config()`` / ``to_js_dict()``
 * Simulated Baum-Welch training iterations via a REST endpoint
 
 Run
@@ -18,6 +18,7 @@ Run
 
     cd state_transition_diagrams
     pip install -e ".[all]"
+    pip install numba           # optional: JIT-compiles the simulation kernel
     python -m demo.app          # or: python demo/app.py
     # Open http://127.0.0.1:5050
 
@@ -25,15 +26,33 @@ Run
 
 from __future__ import annotations
 
-import json
+import base64
+import hashlib
+import io
 import os
 import sys
 import random
-import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 from flask import Flask, jsonify, render_template, request, send_file
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    from flask_orjson import OrjsonProvider
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+    OrjsonProvider = None  # type: ignore[assignment,misc]
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None  # type: ignore[assignment]
 
 # ---------------------------------------------------------------------------
 # Ensure the library is importable even when running from the demo/ folder
@@ -53,6 +72,21 @@ app = Flask(
     static_folder=os.path.join(os.path.dirname(__file__), "static"),
 )
 
+# The simulate payload carries ndarrays; serialise them without ``tolist()``
+# via orjson when available, otherwise convert them in the stdlib encoder.
+if OrjsonProvider is not None:
+    class _JSONProvider(OrjsonProvider):
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+else:  # pragma: no cover
+    class _JSONProvider(DefaultJSONProvider):  # type: ignore[no-redef]
+        @staticmethod
+        def default(o):
+            if isinstance(o, np.ndarray):
+                return o.tolist()
+            return DefaultJSONProvider.default(o)
+
+app.json = _JSONProvider(app)
+
 # Register the library blueprint so assets are at /std/css/… and /std/js/…
 app.register_blueprint(create_blueprint(), url_prefix="/std")
 
@@ -61,25 +95,117 @@ app.register_blueprint(create_blueprint(), url_prefix="/std")
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
-    """Row-normalise a matrix so each row sums to 1."""
-    sums = matrix.sum(axis=1, keepdims=True)
+def _blend_step(
+    out: np.ndarray,
+    prev: np.ndarray,
+    target: np.ndarray,
+    alpha: float,
+    noise: np.ndarray,
+    scratch: np.ndarray,
+    floor: float = -np.inf,
+) -> None:
+    """Write ``normalise((1 - alpha) * prev + alpha * target + noise)`` into *out*.
+
+    Every intermediate lives in *out* or *scratch*, so a step allocates
+    nothing but the row sums.  Values are raised to *floor* before
+    normalising.
+    """
+    np.multiply(prev, 1.0 - alpha, out=out)
+    np.multiply(target, alpha, out=scratch)
+    out += scratch
+    out += noise
+    if floor > -np.inf:
+        np.maximum(out, floor, out=out)
+    sums = out.sum(axis=-1, keepdims=True)
     sums[sums == 0] = 1.0
-    return matrix / sums
-
-
-def _random_transition_matrix(n: int, *, rng: np.random.Generator) -> np.ndarray:
-    raw = rng.dirichlet(np.ones(n), size=n)
-    return raw
-
+    out /= sums
+
+
+def _blend_history_numpy(
+    out: np.ndarray,
+    start: np.ndarray,
+    target: np.ndarray,
+    alphas: np.ndarray,
+    noise: np.ndarray,
+    floor: float = -np.inf,
+) -> None:
+    """Fill ``out[t]`` with the blend of ``out[t - 1]`` (or *start*) toward *target*."""
+    scratch = np.empty_like(target)
+    prev = start
+    for t in range(alphas.shape[0]):
+        _blend_step(out[t], prev, target, alphas[t], noise[t], scratch, floor)
+        prev = out[t]
+
+
+def _blend_history_loops(out, start, target, alphas, noise, floor=-np.inf):
+    """Scalar-loop version of :func:`_blend_history_numpy` for Numba to compile."""
+    n_iter, n_rows, n_cols = out.shape
+    prev = start
+    for t in range(n_iter):
+        keep = 1.0 - alphas[t]
+        cur = out[t]
+        for r in range(n_rows):
+            total = 0.0
+            for c in range(n_cols):
+                v = prev[r, c] * keep + target[r, c] * alphas[t] + noise[t, r, c]
+                if v < floor:
+                    v = floor
+                cur[r, c] = v
+                total += v
+            if total == 0.0:
+                total = 1.0
+            for c in range(n_cols):
+                cur[r, c] /= total
+        prev = cur
+
+
+# Each iteration depends on the previous one, so the kernel stays serial
+_blend_history = (
+    njit(cache=True)(_blend_history_loops) if njit is not None else _blend_history_numpy
+)
 
-def _random_emission_matrix(n: int, m: int, *, rng: np.random.Generator) -> np.ndarray:
-    raw = rng.dirichlet(np.ones(m), size=n)
-    return raw
 
+def _dirichlet_ones(shape: tuple[int, ...], *, rng: np.random.Generator) -> np.ndarray:
+    """Draw flat Dirichlet(1, …, 1) vectors along the last axis of *shape*.
 
-def _random_initial(n: int, *, rng: np.random.Generator) -> np.ndarray:
-    return rng.dirichlet(np.ones(n))
+    Gamma(1) is the standard exponential, which NumPy samples far faster
+    than the general Gamma path with an array of shape parameters.
+    """
+    draws = rng.standard_exponential(shape)
+    draws /= draws.sum(axis=-1, keepdims=True)
+    return draws
+
+
+def _dirichlet_safe(
+    alpha: np.ndarray,
+    size: tuple[int, ...],
+    *,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Draw Dirichlet(*alpha*) vectors with shape ``size + alpha.shape``.
+
+    When any ``alpha >= 1`` all Gamma deviates are drawn in a single call
+    and normalised.  Small concentrations make the Gamma draws underflow to
+    zero (and the normalisation return NaN), so those use the Beta
+    stick-breaking construction instead.
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    if (alpha == 1.0).all():
+        return _dirichlet_ones(size + alpha.shape, rng=rng)
+    if alpha.max() >= 1.0:
+        draws = rng.standard_gamma(alpha, size=size + alpha.shape)
+        draws /= draws.sum(axis=-1, keepdims=True)
+        return draws
+
+    draws = np.empty(size + alpha.shape)
+    remaining = np.ones(size)
+    tail = alpha[::-1].cumsum()[::-1]
+    for k in range(alpha.shape[0] - 1):
+        frac = rng.beta(alpha[k], tail[k + 1], size=size)
+        draws[..., k] = remaining * frac
+        remaining *= 1.0 - frac
+    draws[..., -1] = remaining
+    return draws
 
 
 def _simulate_training(
@@ -87,43 +213,193 @@ def _simulate_training(
     n_obs: int,
     n_iterations: int,
     seed: int | None = None,
-) -> list[dict]:
-    """Simulate Baum-Welch–style training iterations (synthetic convergence)."""
+    *,
+    noise_out: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Simulate Baum-Welch–style training iterations (synthetic convergence).
+
+    Returns the whole history as stacked arrays: ``A`` ``(T, N, N)``,
+    ``B`` ``(T, N, M)``, ``pi`` ``(T, N)``, and ``iteration`` /
+    ``log_likelihood`` ``(T,)``.
+
+    *noise_out*, if given, is a scratch buffer of
+    ``n_iterations * n_states * (n_states + n_obs + 1)`` floats that the
+    noise is drawn into, so batched runs of one shape can share it.
+    """
     rng = np.random.default_rng(seed)
 
-    # Target (converged) parameters
-    A_target = _random_transition_matrix(n_states, rng=rng)
-    B_target = _random_emission_matrix(n_states, n_obs, rng=rng)
-    pi_target = _random_initial(n_states, rng=rng)
-
-    # Starting parameters (far from target)
-    A = _random_transition_matrix(n_states, rng=rng)
-    B = _random_emission_matrix(n_states, n_obs, rng=rng)
-    pi = _random_initial(n_states, rng=rng)
-
-    iterations = []
-    ll = -500.0 - rng.random() * 200
-
-    for i in range(1, n_iterations + 1):
-        # Blend toward target (simulating convergence)
-        alpha = 1.0 - np.exp(-0.12 * i)
-        A = _normalise_rows((1 - alpha) * A + alpha * A_target + rng.normal(0, 0.005 / i, A.shape).clip(-0.05, 0.05))
-        B = _normalise_rows((1 - alpha) * B + alpha * B_target + rng.normal(0, 0.005 / i, B.shape).clip(-0.05, 0.05))
-        pi_raw = (1 - alpha) * pi + alpha * pi_target + rng.normal(0, 0.005 / i, pi.shape).clip(-0.05, 0.05)
-        pi_raw = np.clip(pi_raw, 1e-10, None)
-        pi = pi_raw / pi_raw.sum()
-
-        ll += rng.uniform(1.0, 15.0) * np.exp(-0.05 * i)
-
-        iterations.append({
-            "A": A.tolist(),
-            "B": B.tolist(),
-            "pi": pi.tolist(),
-            "iteration": i,
-            "log_likelihood": round(float(ll), 4),
-        })
+    # Target (converged) and starting (far from target) parameters
+    A_target, A = _dirichlet_safe(np.ones(n_states), (2, n_states), rng=rng)
+    B_target, B = _dirichlet_safe(np.ones(n_obs), (2, n_states), rng=rng)
+    pi_target, pi = _dirichlet_safe(np.ones(n_states), (2,), rng=rng)
+
+    # Per-iteration blend factors, noise and log-likelihood, drawn up front
+    steps = np.arange(1, n_iterations + 1)
+    alphas = 1.0 - np.exp(-0.12 * steps)
+    scales = 0.005 / steps
+    # A single draw backs all three noise tensors; each is a contiguous view
+    if noise_out is None:
+        noise = rng.standard_normal(n_iterations * n_states * (n_states + n_obs + 1))
+    else:
+        noise = rng.standard_normal(out=noise_out)
+    flat_A, flat_B, flat_pi = np.split(
+        noise, np.cumsum([n_iterations * n_states * n_states, n_iterations * n_states * n_obs]),
+    )
+    noise_A = flat_A.reshape(n_iterations, n_states, n_states)
+    noise_B = flat_B.reshape(n_iterations, n_states, n_obs)
+    noise_pi = flat_pi.reshape(n_iterations, n_states)
+    noise_A *= scales[:, None, None]
+    noise_B *= scales[:, None, None]
+    noise_pi *= scales[:, None]
+    np.clip(noise, -0.05, 0.05, out=noise)
+    lls = -500.0 - rng.random() * 200
+    lls += np.cumsum(rng.uniform(1.0, 15.0, n_iterations) * np.exp(-0.05 * steps))
+
+    # Each step is written into its own slot, so the slots can be returned as-is
+    A_hist = np.empty((n_iterations, n_states, n_states))
+    B_hist = np.empty((n_iterations, n_states, n_obs))
+    pi_hist = np.empty((n_iterations, n_states))
+
+    # Blend toward target (simulating convergence); pi is a one-row matrix
+    _blend_history(A_hist, A, A_target, alphas, noise_A)
+    _blend_history(B_hist, B, B_target, alphas, noise_B)
+    _blend_history(
+        pi_hist[:, None, :], pi[None, :], pi_target[None, :], alphas,
+        noise_pi[:, None, :], 1e-10,
+    )
 
-    return iterations
+    # One array per field (not a dict per iteration): a handful of objects
+    # however many iterations there are
+    return {
+        "A": A_hist,
+        "B": B_hist,
+        "pi": pi_hist,
+        "iteration": steps,
+        "log_likelihood": np.round(lls, 4),
+    }
+
+
+_MAX_BATCH_JOBS = 16
+
+_RENDER_CACHE_SIZE = 128
+# Bound memory as well as entry count: the matrix and format come from the
+# client, so single PNG/PDF renders can be large
+_RENDER_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_RENDER_CACHE_MAX_ITEM_BYTES = 1024 * 1024
+_render_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _render_static_cached(
+    A: np.ndarray,
+    labels: tuple[str, ...] | None,
+    fmt: str,
+    title: str,
+) -> bytes:
+    """Render *A* with Graphviz, reusing the output of identical earlier requests.
+
+    Keeps the last ``_RENDER_CACHE_SIZE`` outputs (at most
+    ``_RENDER_CACHE_MAX_BYTES`` in total), keyed on a digest of the matrix
+    plus every other input, so repeats skip the Graphviz subprocess.  Outputs
+    over ``_RENDER_CACHE_MAX_ITEM_BYTES`` are returned but not kept.
+    """
+    key = (hashlib.blake2b(A.tobytes()).digest(), A.shape, A.dtype.str, labels, fmt, title)
+    with _render_cache_lock:
+        if key in _render_cache:
+            _render_cache.move_to_end(key)
+            return _render_cache[key]
+
+    cfg = DiagramConfig(title=title, output_format=fmt)
+    dot = render_state_diagram(A, state_labels=labels, config=cfg, fmt=fmt)
+    # Graphviz writes to stdout, so nothing touches the filesystem
+    rendered = dot.pipe()
+    if len(rendered) > _RENDER_CACHE_MAX_ITEM_BYTES:
+        return rendered
+
+    with _render_cache_lock:
+        _render_cache[key] = rendered
+        total = sum(map(len, _render_cache.values()))
+        while len(_render_cache) > _RENDER_CACHE_SIZE or total > _RENDER_CACHE_MAX_BYTES:
+            total -= len(_render_cache.popitem(last=False)[1])
+    return rendered
+
+
+# Fixed-point scale for quantized transport (4 decimals, fits in int16)
+_QUANT_SCALE = 10_000
+
+
+def _quantize(probs: np.ndarray) -> dict:
+    """Pack probabilities as base64 little-endian int16 holding ``round(p * scale)``."""
+    packed = np.rint(probs * _QUANT_SCALE).astype("<i2")
+    return {
+        "dtype": "int16",
+        "scale": _QUANT_SCALE,
+        "shape": list(probs.shape),
+        "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+    }
+
+
+@dataclass(frozen=True)
+class _SimulateJob:
+    """Validated parameters for one simulation (out-of-range values are clamped)."""
+
+    n_states: int
+    n_obs: int
+    n_iterations: int
+    seed: int
+    quantize: bool = False
+
+    @classmethod
+    def from_json(cls, data: Any) -> _SimulateJob:
+        """Parse one job from a request dict; raise ``ValueError`` if malformed."""
+        if not isinstance(data, dict):
+            raise ValueError("simulation parameters must be a JSON object")
+        try:
+            n_states = int(data.get("n_states", 3))
+            n_obs = int(data.get("n_observations", 4))
+            n_iter = int(data.get("n_iterations", 30))
+            seed_val = data.get("seed")
+            seed = int(seed_val) if seed_val is not None else random.randint(0, 2**31)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"invalid simulation parameter: {exc}") from None
+        if seed < 0:
+            raise ValueError("invalid simulation parameter: seed must be non-negative")
+        quantize = data.get("quantize")
+        if quantize is None:
+            quantize = False
+        elif not isinstance(quantize, bool):
+            raise ValueError("invalid simulation parameter: quantize must be a boolean")
+
+        return cls(
+            n_states=max(2, min(n_states, 12)),
+            n_obs=max(2, min(n_obs, 12)),
+            n_iterations=max(1, min(n_iter, 200)),
+            seed=seed,
+            quantize=quantize,
+        )
+
+
+def _run_simulations(jobs: list[_SimulateJob]) -> list[dict]:
+    """Run simulation jobs, sharing one noise buffer among jobs of the same shape.
+
+    Every job keeps its own seeded generator, so a job gives the same result
+    whether it runs alone or in a batch.
+    """
+    results: list[dict] = [{} for _ in jobs]
+    groups: dict[tuple[int, int, int], list[int]] = {}
+    for idx, job in enumerate(jobs):
+        groups.setdefault((job.n_states, job.n_obs, job.n_iterations), []).append(idx)
+
+    for (n_states, n_obs, n_iter), indices in groups.items():
+        noise_out = np.empty(n_iter * n_states * (n_states + n_obs + 1))
+        for idx in indices:
+            seed = jobs[idx].seed
+            history = _simulate_training(n_states, n_obs, n_iter, seed=seed, noise_out=noise_out)
+            if jobs[idx].quantize:
+                for key in ("A", "B", "pi"):
+                    history[key] = _quantize(history[key])
+            results[idx] = {"history": history, "seed": seed}
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -145,28 +421,63 @@ def index():
 def simulate():
     """Generate simulated training iterations and return as JSON.
 
+    The response is ``{"history": {...}, "seed": ...}`` where ``history``
+    holds one array per field (``A``, ``B``, ``pi``, ``iteration``,
+    ``log_likelihood``), indexed by iteration first.
+
     Request body (JSON)::
 
         {
             "n_states": 3,
             "n_observations": 4,
             "n_iterations": 30,
-            "seed": 42          // optional
+            "seed": 42,         // optional
+            "quantize": false   // optional
         }
+
+    With ``"quantize": true``, ``A``, ``B`` and ``pi`` are sent as
+    ``{"dtype": "int16", "scale", "shape", "data"}`` where ``data`` is the
+    base64 of little-endian ``round(p * scale)`` values — about 4x smaller.
+
+    Out-of-range values are clamped; non-numeric values, a negative seed or
+    a non-boolean ``quantize`` return ``400``.
     """
     data = request.get_json(silent=True) or {}
-    n_states = int(data.get("n_states", 3))
-    n_obs = int(data.get("n_observations", 4))
-    n_iter = int(data.get("n_iterations", 30))
-    seed_val = data.get("seed")
-    seed = int(seed_val) if seed_val is not None else random.randint(0, 2**31)
+    try:
+        job = _SimulateJob.from_json(data)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(_run_simulations([job])[0])
+
 
-    n_states = max(2, min(n_states, 12))
-    n_obs = max(2, min(n_obs, 12))
-    n_iter = max(1, min(n_iter, 200))
+@app.route("/api/simulate_batch", methods=["POST"])
+def simulate_batch():
+    """Run several simulations in one request.
 
-    iterations = _simulate_training(n_states, n_obs, n_iter, seed=seed)
-    return jsonify({"iterations": iterations, "seed": seed})
+    Request body (JSON)::
+
+        {
+            "jobs": [
+                {"n_states": 3, "n_observations": 4, "n_iterations": 30},
+                {"n_states": 5, "seed": 7}
+            ]
+        }
+
+    Each job takes the same fields as ``/api/simulate``.  The response is
+    ``{"results": [...]}`` with one ``{"history", "seed"}`` entry per job, in
+    request order.  More than 16 jobs returns ``400``.
+    """
+    data = request.get_json(silent=True) or {}
+    raw_jobs = data.get("jobs", []) if isinstance(data, dict) else None
+    if not isinstance(raw_jobs, list):
+        return jsonify({"error": "'jobs' must be a list"}), 400
+    if len(raw_jobs) > _MAX_BATCH_JOBS:
+        return jsonify({"error": f"at most {_MAX_BATCH_JOBS} jobs per batch"}), 400
+    try:
+        jobs = [_SimulateJob.from_json(job) for job in raw_jobs]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"results": _run_simulations(jobs)})
 
 
 @app.route("/api/render_static", methods=["POST"])
@@ -185,22 +496,22 @@ def render_static():
     data = request.get_json(silent=True) or {}
     A = np.array(data.get("A", [[0.7, 0.3], [0.4, 0.6]]))
     labels = data.get("state_labels")
-    fmt = data.get("format", "svg")
-    title = data.get("title", "State Transition Diagram")
+    # Coerced so a non-string value can't make the cache key unhashable
+    fmt = str(data.get("format", "svg"))
+    title = str(data.get("title", "State Transition Diagram"))
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        save_path = os.path.join(tmpdir, "diagram")
-        cfg = DiagramConfig(title=title, output_format=fmt)
-        render_state_diagram(A, state_labels=labels, save_path=save_path, config=cfg, fmt=fmt)
+    labels = tuple(str(label) for label in labels) if labels is not None else None
+    rendered = _render_static_cached(A, labels, fmt, title)
 
-        out_file = save_path + "." + fmt
-        mime = {
-            "svg": "image/svg+xml",
-            "png": "image/png",
-            "pdf": "application/pdf",
-        }.get(fmt, "application/octet-stream")
+    mime = {
+        "svg": "image/svg+xml",
+        "png": "image/png",
+        "pdf": "application/pdf",
+    }.get(fmt, "application/octet-stream")
 
-        return send_file(out_file, mimetype=mime, as_attachment=True, download_name=f"diagram.{fmt}")
+    return send_file(
+        io.BytesIO(rendered), mimetype=mime, as_attachment=True, download_name=f"diagram.{fmt}",
+    )
 
 
 @app.route("/api/config", methods=["GET"])
@@ -209,7 +520,7 @@ def get_config():
     cfg = DiagramConfig()
     return jsonify({
         "state_colors": cfg.state_colors,
-        "interactive_state_colors": cfg.interactive_state_colors,
+        "interactive_state_colors": [dict(colors) for colors in cfg.interactive_state_colors],
         "observation_fill": cfg.observation_fill,
         "observation_stroke": cfg.observation_stroke,
         "observation_text": cfg.observation_text,
@@ -229,7 +540,7 @@ def get_config():
         "particles_enabled": cfg.particles_enabled,
         "decongestion_enabled": cfg.decongestion_enabled,
         "animation_speed": cfg.animation_speed,
-        "js_config": json.loads(cfg.to_js_config()),
+        "js_config": cfg.to_js_dict(),
     })
 
 
@@ -31,9 +31,14 @@ Flask integration::
 
 from __future__ import annotations
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from state_transition_diagrams.config import DiagramConfig
-from state_transition_diagrams.renderer import render_state_diagram
-from state_transition_diagrams.flask_blueprint import create_blueprint
+
+if TYPE_CHECKING:
+    from state_transition_diagrams.flask_blueprint import create_blueprint
+    from state_transition_diagrams.renderer import render_state_diagram
 
 __all__ = [
     "DiagramConfig",
@@ -42,3 +47,23 @@ __all__ = [
 ]
 
 __version__ = "1.0.0"
+
+# Exports whose modules pull in numpy / graphviz / flask are imported on
+# first access (PEP 562), so ``DiagramConfig``-only users skip that cost.
+_LAZY_EXPORTS = {
+    "render_state_diagram": "state_transition_diagrams.renderer",
+    "create_blueprint": "state_transition_diagrams.flask_blueprint",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
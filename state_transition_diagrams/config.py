@@ -19,8 +19,53 @@ Example
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Optional, Sequence
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+class _FrozenDict(dict):
+    """A ``dict`` that refuses mutation but still pickles and deep-copies."""
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore[assignment]
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (type(self), (dict(self),))
+
+
+# Default palettes are shared by every ``DiagramConfig``, so they are frozen
+# (tuples of read-only dicts) instead of being rebuilt per instance.
+_DEFAULT_STATE_COLORS: tuple[str, ...] = (
+    "#2E86AB", "#A23B72", "#F18F01", "#2CA58D",
+    "#E84855", "#6B4226", "#7768AE", "#1B998B",
+)
+
+_DEFAULT_INTERACTIVE_STATE_COLORS: tuple[Mapping[str, Any], ...] = tuple(
+    _FrozenDict(entry) for entry in (
+        {"base": "#F59E0B", "light": "#FDE68A", "dark": "#92400E", "grad": ("#FBBF24", "#D97706")},
+        {"base": "#3B82F6", "light": "#93C5FD", "dark": "#1E3A8A", "grad": ("#60A5FA", "#2563EB")},
+        {"base": "#10B981", "light": "#6EE7B7", "dark": "#064E3B", "grad": ("#34D399", "#059669")},
+        {"base": "#F43F5E", "light": "#FDA4AF", "dark": "#881337", "grad": ("#FB7185", "#E11D48")},
+        {"base": "#8B5CF6", "light": "#C4B5FD", "dark": "#4C1D95", "grad": ("#A78BFA", "#7C3AED")},
+        {"base": "#06B6D4", "light": "#67E8F9", "dark": "#155E75", "grad": ("#22D3EE", "#0891B2")},
+        {"base": "#EC4899", "light": "#F9A8D4", "dark": "#831843", "grad": ("#F472B6", "#DB2777")},
+        {"base": "#14B8A6", "light": "#5EEAD4", "dark": "#134E4A", "grad": ("#2DD4BF", "#0D9488")},
+        {"base": "#F97316", "light": "#FDBA74", "dark": "#7C2D12", "grad": ("#FB923C", "#EA580C")},
+        {"base": "#6366F1", "light": "#A5B4FC", "dark": "#3730A3", "grad": ("#818CF8", "#4F46E5")},
+        {"base": "#84CC16", "light": "#BEF264", "dark": "#3F6212", "grad": ("#A3E635", "#65A30D")},
+        {"base": "#E879F9", "light": "#F0ABFC", "dark": "#701A75", "grad": ("#D946EF", "#C026D3")},
+    )
+)
 
 
 @dataclass
@@ -31,7 +76,7 @@ class DiagramConfig:
 
     Attributes
     ----------
-    state_colors : list[str]
+    state_colors : sequence of str
         Hex colours for hidden-state nodes (cycled if fewer than N).
     observation_fill : str
         Background fill colour for observation nodes.
@@ -72,13 +117,13 @@ class DiagramConfig:
         interactive diagram. When disabled, all edges are shown.
     animation_speed : float
         Playback speed multiplier for the interactive diagram.
+    interactive_state_colors : sequence of mapping
+        ``{base, light, dark, grad}`` colours for the interactive diagram.
+        The default palettes are read-only; pass new sequences to override.
     """
 
     # ── Colour palette ──────────────────────────────────────────── #
-    state_colors: list[str] = field(default_factory=lambda: [
-        "#2E86AB", "#A23B72", "#F18F01", "#2CA58D",
-        "#E84855", "#6B4226", "#7768AE", "#1B998B",
-    ])
+    state_colors: Sequence[str] = _DEFAULT_STATE_COLORS
 
     observation_fill: str = "#F1F5F9"
     observation_stroke: str = "#94A3B8"
@@ -109,20 +154,7 @@ class DiagramConfig:
     animation_speed: float = 1.0
 
     # ── Interactive diagram JS colour palette (richer) ──────────── #
-    interactive_state_colors: list[dict] = field(default_factory=lambda: [
-        {"base": "#F59E0B", "light": "#FDE68A", "dark": "#92400E", "grad": ["#FBBF24", "#D97706"]},
-        {"base": "#3B82F6", "light": "#93C5FD", "dark": "#1E3A8A", "grad": ["#60A5FA", "#2563EB"]},
-        {"base": "#10B981", "light": "#6EE7B7", "dark": "#064E3B", "grad": ["#34D399", "#059669"]},
-        {"base": "#F43F5E", "light": "#FDA4AF", "dark": "#881337", "grad": ["#FB7185", "#E11D48"]},
-        {"base": "#8B5CF6", "light": "#C4B5FD", "dark": "#4C1D95", "grad": ["#A78BFA", "#7C3AED"]},
-        {"base": "#06B6D4", "light": "#67E8F9", "dark": "#155E75", "grad": ["#22D3EE", "#0891B2"]},
-        {"base": "#EC4899", "light": "#F9A8D4", "dark": "#831843", "grad": ["#F472B6", "#DB2777"]},
-        {"base": "#14B8A6", "light": "#5EEAD4", "dark": "#134E4A", "grad": ["#2DD4BF", "#0D9488"]},
-        {"base": "#F97316", "light": "#FDBA74", "dark": "#7C2D12", "grad": ["#FB923C", "#EA580C"]},
-        {"base": "#6366F1", "light": "#A5B4FC", "dark": "#3730A3", "grad": ["#818CF8", "#4F46E5"]},
-        {"base": "#84CC16", "light": "#BEF264", "dark": "#3F6212", "grad": ["#A3E635", "#65A30D"]},
-        {"base": "#E879F9", "light": "#F0ABFC", "dark": "#701A75", "grad": ["#D946EF", "#C026D3"]},
-    ])
+    interactive_state_colors: Sequence[Mapping[str, Any]] = _DEFAULT_INTERACTIVE_STATE_COLORS
 
     def to_js_config(self) -> str:
         """Serialise the interactive-diagram settings to a JavaScript object literal.
@@ -136,9 +168,25 @@ class DiagramConfig:
         str
             A JavaScript object literal string.
         """
-        import json
-        return json.dumps({
-            "stateColors": self.interactive_state_colors,
+        # The default config is what most pages inject; serialise it once
+        if self == _default_config():
+            return _default_js_config()
+        return _dumps_js(self.to_js_dict())
+
+    def to_js_dict(self) -> dict[str, Any]:
+        """Return the interactive-diagram settings as a plain dict.
+
+        This is the object :meth:`to_js_config` serialises.  Use it when the
+        settings are nested inside a larger JSON response, to avoid a
+        serialise → parse round trip.
+
+        Returns
+        -------
+        dict
+            JSON-serialisable settings keyed by their JavaScript names.
+        """
+        return {
+            "stateColors": [dict(colors) for colors in self.interactive_state_colors],
             "obsColor": {
                 "fill": self.observation_fill,
                 "stroke": self.observation_stroke,
@@ -154,4 +202,21 @@ class DiagramConfig:
             "animationSpeed": self.animation_speed,
             "fontFamily": self.font_family,
             "monoFontFamily": self.mono_font_family,
-        }, indent=2)
+        }
+
+
+def _dumps_js(payload: dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(payload, indent=2)
+
+
+@lru_cache(maxsize=None)
+def _default_config() -> DiagramConfig:
+    """Shared default instance used to detect unmodified configs (do not mutate)."""
+    return DiagramConfig()
+
+
+@lru_cache(maxsize=None)
+def _default_js_config() -> str:
+    return _dumps_js(_default_config().to_js_dict())
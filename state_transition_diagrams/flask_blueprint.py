@@ -17,18 +17,30 @@ Then in your HTML template::
 
     <link rel="stylesheet" href="/std/css/state_diagram.css">
     <script src="/std/js/state_diagram.js"></script>
+
+A pre-compressed ``.br`` / ``.gz`` sibling is served instead of the plain
+file when one exists and the client accepts that encoding.  Long-lived
+``immutable`` caching is opt-in via ``cache_max_age``, since the asset URLs
+carry no version.
 """
 
 from __future__ import annotations
 
+import mimetypes
 import os
+from typing import Optional
+
+from flask import Blueprint, Response, abort, request, send_from_directory
+from werkzeug.security import safe_join
 
-from flask import Blueprint
+# Pre-compressed variants, in order of preference
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
 
 
 def create_blueprint(
     name: str = "state_transition_diagrams",
     url_prefix: str = "/std",
+    cache_max_age: Optional[int] = None,
 ) -> Blueprint:
     """Create a Flask blueprint that serves the library's static files.
 
@@ -38,6 +50,12 @@ def create_blueprint(
         Blueprint name (must be unique within the app).
     url_prefix : str
         URL prefix under which the static files are served.
+    cache_max_age : int or None
+        ``Cache-Control`` max-age (seconds) for the assets, marked
+        ``immutable``.  Only set this when the asset URLs change with the
+        library version (e.g. a versioned ``url_prefix``); otherwise browsers
+        keep stale JS/CSS after an upgrade.  The default ``None`` falls back
+        to the app's ``SEND_FILE_MAX_AGE_DEFAULT``.
 
     Returns
     -------
@@ -45,11 +63,35 @@ def create_blueprint(
     """
     static_dir = os.path.join(os.path.dirname(__file__), "static")
 
-    bp = Blueprint(
-        name,
-        __name__,
-        static_folder=static_dir,
-        static_url_path="",
-        url_prefix=url_prefix,
-    )
+    bp = Blueprint(name, __name__, url_prefix=url_prefix)
+
+    def static(filename: str) -> Response:
+        # The compressed siblings are only served through content negotiation
+        if filename.endswith(tuple(suffix for _, suffix in _ENCODINGS)):
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        accepted = request.accept_encodings
+
+        for encoding, suffix in _ENCODINGS:
+            compressed = safe_join(static_dir, filename + suffix)
+            if accepted[encoding] and compressed and os.path.isfile(compressed):
+                response = send_from_directory(
+                    static_dir, filename + suffix,
+                    mimetype=mimetype, max_age=cache_max_age,
+                )
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(
+                static_dir, filename, mimetype=mimetype, max_age=cache_max_age,
+            )
+
+        response.vary.add("Accept-Encoding")
+        if cache_max_age is not None:
+            response.cache_control.immutable = True
+        return response
+
+    # Keep the ``<name>.static`` endpoint so ``url_for`` calls keep working
+    bp.add_url_rule("/<path:filename>", endpoint="static", view_func=static)
     return bp
@@ -97,15 +97,15 @@ def render_state_diagram(
         pad="0.5",
     )
 
-    # ─── Node style ─── #
-    for i, label in enumerate(state_labels):
-        color = config.state_colors[i % len(config.state_colors)]
-        dot.node(
-            str(i),
-            label=label,
+    # ─── States and transitions ─── #
+    # Shared node/edge attributes are emitted once as defaults, scoped to an
+    # anonymous subgraph so nodes or edges a caller adds to the returned
+    # graph keep Graphviz's own defaults.
+    with dot.subgraph() as states:
+        states.attr(
+            "node",
             shape=config.node_shape,
             style="filled",
-            fillcolor=color,
             fontcolor="white",
             fontsize="14",
             fontname=f"{config.font_family} Bold",
@@ -113,26 +113,35 @@ def render_state_diagram(
             height="1.0",
             fixedsize="true",
         )
-
-    # ─── Edges ─── #
-    max_prob = A.max() if A.max() > 0 else 1.0
-    for i in range(N):
-        for j in range(N):
-            p = A[i, j]
-            if p < prob_threshold:
-                continue
-            penwidth = str(round(0.5 + 3.5 * (p / max_prob), 2))
-            edge_label = f"{p:.3f}"
+        states.attr("edge", fontsize="10", fontname=config.font_family)
+
+        for i, label in enumerate(state_labels):
+            color = config.state_colors[i % len(config.state_colors)]
+            states.node(str(i), label=label, fillcolor=color)
+
+        # ─── Edges ─── #
+        max_prob = A.max() if A.max() > 0 else 1.0
+        # Filter in NumPy; only the surviving edges reach Python.  Values are
+        # formatted from ``tolist()`` floats, which is cheaper than formatting
+        # NumPy scalars (or ``np.char.mod``, which loops in Python anyway).
+        # Only the leading N columns have nodes; extra columns (e.g. a
+        # non-square matrix) are ignored, as they always were
+        src, dst = np.nonzero(A[:, :N] >= prob_threshold)
+        probs = A[src, dst]
+        penwidths = map(str, np.round(0.5 + 3.5 * (probs / max_prob), 2).tolist())
+        edge_labels = [f"{p:.3f}" for p in probs.tolist()]
+        node_ids = [str(i) for i in range(N)]
+        for i, j, penwidth, edge_label in zip(
+            src.tolist(), dst.tolist(), penwidths, edge_labels
+        ):
             edge_color = (
                 config.edge_color if i != j
                 else config.state_colors[i % len(config.state_colors)]
             )
-            dot.edge(
-                str(i), str(j),
+            states.edge(
+                node_ids[i], node_ids[j],
                 label=edge_label,
                 penwidth=penwidth,
-                fontsize="10",
-                fontname=config.font_family,
                 color=edge_color,
                 fontcolor=edge_color,
             )
@@ -6,7 +6,11 @@ Tests for ``state_transition_diagrams.config.DiagramConfig``.
 
 from __future__ import annotations
 
+import copy
+import dataclasses
 import json
+import pickle
+
 import pytest
 
 from state_transition_diagrams.config import DiagramConfig
@@ -39,9 +43,23 @@ class TestDiagramConfigDefaults:
             assert "light" in entry
             assert "dark" in entry
             assert "grad" in entry
-            assert isinstance(entry["grad"], list)
+            assert isinstance(entry["grad"], (list, tuple))
             assert len(entry["grad"]) == 2
 
+    def test_default_palettes_are_shared_and_read_only(self):
+        a, b = DiagramConfig(), DiagramConfig()
+        assert a.interactive_state_colors is b.interactive_state_colors
+        with pytest.raises(TypeError):
+            a.interactive_state_colors[0]["base"] = "#000000"
+
+    def test_default_config_round_trips(self):
+        cfg = DiagramConfig()
+        assert copy.deepcopy(cfg) == cfg
+        assert pickle.loads(pickle.dumps(cfg)) == cfg
+        as_dict = dataclasses.asdict(cfg)
+        assert as_dict["interactive_state_colors"][0]["base"] == "#F59E0B"
+        assert as_dict["state_colors"] == cfg.state_colors
+
     def test_default_observation_colors(self):
         cfg = DiagramConfig()
         assert cfg.observation_fill == "#F1F5F9"
@@ -160,6 +178,20 @@ class TestDiagramConfigToJsConfig:
         assert "fontFamily" in data
         assert "monoFontFamily" in data
 
+    def test_default_js_config_is_cached(self):
+        assert DiagramConfig().to_js_config() is DiagramConfig().to_js_config()
+
+    def test_custom_config_bypasses_cache(self):
+        default = DiagramConfig().to_js_config()
+        custom = DiagramConfig(font_family="Arial").to_js_config()
+        assert custom != default
+        assert json.loads(custom)["fontFamily"] == "Arial"
+
+    def test_to_js_dict_matches_serialised_config(self):
+        for cfg in (DiagramConfig(), DiagramConfig(animation_speed=2.0)):
+            as_json = json.loads(json.dumps(cfg.to_js_dict()))
+            assert as_json == json.loads(cfg.to_js_config())
+
     def test_custom_config_reflected_in_js(self):
         cfg = DiagramConfig(
             particles_enabled=False,
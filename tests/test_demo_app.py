@@ -9,68 +9,80 @@ and all its endpoints work correctly.
 
 from __future__ import annotations
 
+import base64
+import importlib.util
 import json
+import re
 import shutil
-import sys
-from pathlib import Path
 
+import numpy as np
 import pytest
 
-# Ensure the library root is importable
-_lib_root = Path(__file__).resolve().parent.parent
-if str(_lib_root.parent) not in sys.path:
-    sys.path.insert(0, str(_lib_root.parent))
+# Checked once at import rather than per test; nothing is imported here
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("flask") is None, reason="flask not installed"
+)
+_HAS_GRAPHVIZ = importlib.util.find_spec("graphviz") is not None
+_HAS_DOT = shutil.which("dot") is not None
 
-flask = pytest.importorskip("flask")
 
-from demo.app import app as demo_app
-
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
+    """One test client for the whole run (no test changes the app config)."""
+    from demo.app import app as demo_app
+
     demo_app.config["TESTING"] = True
     return demo_app.test_client()
 
 
+@pytest.fixture(scope="module")
+def index_response(client):
+    """The demo page, rendered once and shared by the index tests."""
+    return client.get("/")
+
+
+@pytest.fixture(scope="module")
+def index_html(index_response):
+    return index_response.get_data(as_text=True)
+
+
+# Library features the demo page is expected to document
+_DEMO_FEATURES = (
+    "feedIteration", "onComplete", "play()", "pause()",
+    "stepForward", "stepBack", "goFirst", "goLast",
+    "seekTo", "setSpeed", "toggleParticles", "toggleDecongestion",
+    "toggle3D", "saveSVG", "savePNG", "wireControls", "reset",
+    "DiagramConfig", "render_state_diagram", "create_blueprint",
+    "HMMDiagram",
+)
+_DEMO_FEATURE_RE = re.compile("|".join(map(re.escape, _DEMO_FEATURES)))
+
+
 class TestDemoIndex:
     """Test the main demo page."""
 
-    def test_index_200(self, client):
-        resp = client.get("/")
-        assert resp.status_code == 200
+    def test_index_200(self, index_response):
+        assert index_response.status_code == 200
 
-    def test_index_contains_html(self, client):
-        data = client.get("/").get_data(as_text=True)
-        assert "<!DOCTYPE html>" in data
-
-    def test_index_loads_library_css(self, client):
-        data = client.get("/").get_data(as_text=True)
-        assert "/std/css/state_diagram.css" in data
-
-    def test_index_loads_library_js(self, client):
-        data = client.get("/").get_data(as_text=True)
-        assert "/std/js/state_diagram.js" in data
-
-    def test_index_loads_d3(self, client):
-        data = client.get("/").get_data(as_text=True)
-        assert "d3.v7" in data or "d3.js" in data
-
-    def test_index_contains_js_config(self, client):
-        data = client.get("/").get_data(as_text=True)
-        assert "STD_SERVER_CONFIG" in data
-
-    def test_index_contains_all_features(self, client):
-        data = client.get("/").get_data(as_text=True)
-        features = [
-            "feedIteration", "onComplete", "play()", "pause()",
-            "stepForward", "stepBack", "goFirst", "goLast",
-            "seekTo", "setSpeed", "toggleParticles", "toggleDecongestion",
-            "toggle3D", "saveSVG", "savePNG", "wireControls", "reset",
-            "DiagramConfig", "render_state_diagram", "create_blueprint",
-            "HMMDiagram",
-        ]
-        for feat in features:
-            assert feat in data, f"Feature '{feat}' not found in demo page"
+    def test_index_contains_html(self, index_html):
+        assert "<!DOCTYPE html>" in index_html
+
+    def test_index_loads_library_css(self, index_html):
+        assert "/std/css/state_diagram.css" in index_html
+
+    def test_index_loads_library_js(self, index_html):
+        assert "/std/js/state_diagram.js" in index_html
+
+    def test_index_loads_d3(self, index_html):
+        assert "d3.v7" in index_html or "d3.js" in index_html
+
+    def test_index_contains_js_config(self, index_html):
+        assert "STD_SERVER_CONFIG" in index_html
+
+    def test_index_contains_all_features(self, index_html):
+        found = {m.group(0) for m in _DEMO_FEATURE_RE.finditer(index_html)}
+        missing = set(_DEMO_FEATURES) - found
+        assert not missing, f"Features not found in demo page: {sorted(missing)}"
 
 
 class TestDemoLibraryAssets:
@@ -94,9 +106,9 @@ class TestSimulateEndpoint:
         resp = client.post("/api/simulate", json={})
         assert resp.status_code == 200
         data = resp.get_json()
-        assert "iterations" in data
+        assert "history" in data
         assert "seed" in data
-        assert len(data["iterations"]) > 0
+        assert len(data["history"]["iteration"]) > 0
 
     def test_simulate_custom_params(self, client):
         resp = client.post("/api/simulate", json={
@@ -106,25 +118,22 @@ class TestSimulateEndpoint:
             "seed": 42,
         })
         data = resp.get_json()
-        assert len(data["iterations"]) == 10
+        assert data["history"]["iteration"] == list(range(1, 11))
         assert data["seed"] == 42
 
-    def test_simulate_iteration_structure(self, client):
-        resp = client.post("/api/simulate", json={"n_states": 2, "n_observations": 3, "n_iterations": 1, "seed": 99})
-        data = resp.get_json()
-        it = data["iterations"][0]
-        assert "A" in it
-        assert "B" in it
-        assert "pi" in it
-        assert "iteration" in it
-        assert "log_likelihood" in it
+    def test_simulate_history_structure(self, client):
+        resp = client.post("/api/simulate", json={"n_states": 2, "n_observations": 3, "n_iterations": 4, "seed": 99})
+        history = resp.get_json()["history"]
+        assert set(history) == {"A", "B", "pi", "iteration", "log_likelihood"}
+        for field in history.values():
+            assert len(field) == 4
 
     def test_simulate_matrix_dimensions(self, client):
         resp = client.post("/api/simulate", json={"n_states": 3, "n_observations": 5, "n_iterations": 1, "seed": 7})
-        it = resp.get_json()["iterations"][0]
-        A = it["A"]
-        B = it["B"]
-        pi = it["pi"]
+        history = resp.get_json()["history"]
+        A = history["A"][0]
+        B = history["B"][0]
+        pi = history["pi"][0]
         assert len(A) == 3
         assert len(A[0]) == 3
         assert len(B) == 3
@@ -134,22 +143,147 @@ class TestSimulateEndpoint:
     def test_simulate_clamped_states(self, client):
         # n_states capped at 12
         resp = client.post("/api/simulate", json={"n_states": 50, "n_iterations": 1})
-        it = resp.get_json()["iterations"][0]
-        assert len(it["A"]) <= 12
+        A = resp.get_json()["history"]["A"][0]
+        assert len(A) <= 12
 
     def test_simulate_clamped_iterations(self, client):
         resp = client.post("/api/simulate", json={"n_iterations": 999})
         data = resp.get_json()
-        assert len(data["iterations"]) <= 200
+        assert len(data["history"]["iteration"]) <= 200
+
+    def test_simulate_quantized_matches_float(self, client):
+        job = {"n_states": 3, "n_observations": 4, "n_iterations": 5, "seed": 11}
+        exact = client.post("/api/simulate", json=job).get_json()["history"]
+        packed = client.post("/api/simulate", json={**job, "quantize": True}).get_json()["history"]
+        for key in ("A", "B", "pi"):
+            field = packed[key]
+            raw = np.frombuffer(base64.b64decode(field["data"]), dtype="<i2")
+            decoded = raw.reshape(field["shape"]) / field["scale"]
+            np.testing.assert_allclose(decoded, exact[key], atol=0.5 / field["scale"])
+        assert packed["log_likelihood"] == exact["log_likelihood"]
+
+    def test_simulate_invalid_param_400(self, client):
+        resp = client.post("/api/simulate", json={"n_states": "many"})
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
+
+    @pytest.mark.parametrize("value", ["false", 1])
+    def test_simulate_non_boolean_quantize_400(self, client, value):
+        resp = client.post("/api/simulate", json={"quantize": value})
+        assert resp.status_code == 400
+        assert "quantize" in resp.get_json()["error"]
+
+    def test_simulate_null_quantize_means_default(self, client):
+        resp = client.post("/api/simulate", json={"n_iterations": 1, "quantize": None})
+        assert resp.status_code == 200
+        assert isinstance(resp.get_json()["history"]["A"], list)
+
+    def test_simulate_negative_seed_400(self, client):
+        resp = client.post("/api/simulate", json={"seed": -1})
+        assert resp.status_code == 400
+        assert "seed" in resp.get_json()["error"]
+
+    def test_batch_negative_seed_400(self, client):
+        resp = client.post("/api/simulate_batch", json={"jobs": [{"seed": 5}, {"seed": -1}]})
+        assert resp.status_code == 400
+
+    def test_simulate_non_object_body_400(self, client):
+        resp = client.post("/api/simulate", json=[1, 2, 3])
+        assert resp.status_code == 400
 
     def test_simulate_row_normalisation(self, client):
         """Transition matrix rows should approximately sum to 1."""
         resp = client.post("/api/simulate", json={"n_states": 3, "n_iterations": 1, "seed": 123})
-        A = resp.get_json()["iterations"][0]["A"]
+        A = resp.get_json()["history"]["A"][0]
         for row in A:
             assert abs(sum(row) - 1.0) < 0.01
 
 
+class TestSimulateBatchEndpoint:
+    """Test the /api/simulate_batch endpoint."""
+
+    def test_results_in_request_order(self, client):
+        jobs = [
+            {"n_states": 3, "n_iterations": 2, "seed": 1},
+            {"n_states": 5, "n_iterations": 4, "seed": 2},
+            {"n_states": 3, "n_iterations": 2, "seed": 3},
+        ]
+        results = client.post("/api/simulate_batch", json={"jobs": jobs}).get_json()["results"]
+        assert [r["seed"] for r in results] == [1, 2, 3]
+        assert [len(r["history"]["iteration"]) for r in results] == [2, 4, 2]
+        assert len(results[1]["history"]["A"][0]) == 5
+
+    def test_batch_matches_single_job(self, client):
+        job = {"n_states": 4, "n_observations": 3, "n_iterations": 5, "seed": 42}
+        single = client.post("/api/simulate", json=job).get_json()
+        batch = client.post("/api/simulate_batch", json={"jobs": [job, job]}).get_json()
+        assert batch["results"][0] == single
+        assert batch["results"][1] == single
+
+    def test_empty_batch(self, client):
+        resp = client.post("/api/simulate_batch", json={})
+        assert resp.status_code == 200
+        assert resp.get_json()["results"] == []
+
+    def test_invalid_job_400(self, client):
+        resp = client.post("/api/simulate_batch", json={"jobs": [{}, {"seed": "x"}]})
+        assert resp.status_code == 400
+
+    def test_jobs_not_a_list_400(self, client):
+        resp = client.post("/api/simulate_batch", json={"jobs": {"n_states": 3}})
+        assert resp.status_code == 400
+
+    def test_job_count_at_limit(self, client):
+        jobs = [{"n_iterations": 1}] * 16
+        results = client.post("/api/simulate_batch", json={"jobs": jobs}).get_json()["results"]
+        assert len(results) == 16
+
+    def test_too_many_jobs_400(self, client):
+        jobs = [{"n_iterations": 1}] * 17
+        resp = client.post("/api/simulate_batch", json={"jobs": jobs})
+        assert resp.status_code == 400
+        assert "16" in resp.get_json()["error"]
+
+
+class TestSimulationKernel:
+    """The Numba kernel source must match the NumPy fallback."""
+
+    @pytest.mark.parametrize("floor", [-np.inf, 1e-10])
+    def test_loop_kernel_matches_numpy(self, floor):
+        from demo.app import _blend_history_loops, _blend_history_numpy
+
+        rng = np.random.default_rng(0)
+        start, target = rng.dirichlet(np.ones(4), size=(2, 3))
+        alphas = 1.0 - np.exp(-0.12 * np.arange(1, 6))
+        noise = rng.normal(0, 0.05, (5, 3, 4))
+        expected, actual = np.empty((5, 3, 4)), np.empty((5, 3, 4))
+        _blend_history_numpy(expected, start, target, alphas, noise.copy(), floor)
+        _blend_history_loops(actual, start, target, alphas, noise.copy(), floor)
+        np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+
+class TestDirichletSampling:
+    """Both non-flat branches of ``_dirichlet_safe``."""
+
+    def test_small_alpha_uses_stick_breaking(self):
+        from demo.app import _dirichlet_safe
+
+        # Gamma(1e-3) deviates underflow to 0, which would normalise to NaN
+        draws = _dirichlet_safe(np.full(4, 1e-3), (1000,), rng=np.random.default_rng(0))
+        assert draws.shape == (1000, 4)
+        assert np.isfinite(draws).all()
+        np.testing.assert_allclose(draws.sum(axis=-1), 1.0)
+
+    def test_large_alpha_uses_gamma(self):
+        from demo.app import _dirichlet_safe
+
+        alpha = np.array([0.5, 2.0, 5.0])
+        draws = _dirichlet_safe(alpha, (2000, 2), rng=np.random.default_rng(0))
+        assert draws.shape == (2000, 2, 3)
+        np.testing.assert_allclose(draws.sum(axis=-1), 1.0)
+        np.testing.assert_allclose(draws.mean(axis=(0, 1)), alpha / alpha.sum(), atol=0.02)
+
+
 class TestConfigEndpoint:
     """Test the /api/config endpoint."""
 
@@ -181,15 +315,82 @@ class TestConfigEndpoint:
         assert "particlesEnabled" in js
 
 
+@pytest.mark.skipif(not _HAS_GRAPHVIZ, reason="graphviz package not installed")
+class TestRenderCache:
+    """The render cache, with Graphviz's subprocess call stubbed out."""
+
+    def test_repeat_render_pipes_once(self, client, monkeypatch):
+        import graphviz
+
+        import demo.app
+
+        calls = []
+
+        def fake_pipe(self, *args, **kwargs):
+            calls.append(self.format)
+            return b"<svg>cached</svg>"
+
+        monkeypatch.setattr(graphviz.Digraph, "pipe", fake_pipe)
+        monkeypatch.setattr(demo.app, "_render_cache", type(demo.app._render_cache)())
+
+        body = {"A": [[0.3, 0.7], [0.6, 0.4]], "title": "Stubbed"}
+        first = client.post("/api/render_static", json=body)
+        second = client.post("/api/render_static", json=body)
+        assert first.status_code == second.status_code == 200
+        assert first.data == second.data == b"<svg>cached</svg>"
+        assert calls == ["svg"]
+
+        client.post("/api/render_static", json={**body, "title": "Other"})
+        assert len(calls) == 2
+
+    @pytest.fixture
+    def fake_render(self, monkeypatch):
+        """Stub ``pipe`` to return ``size`` bytes; yields the empty cache."""
+        import graphviz
+
+        import demo.app
+
+        size = {"bytes": 10}
+        monkeypatch.setattr(
+            graphviz.Digraph, "pipe", lambda self, *a, **kw: b"x" * size["bytes"]
+        )
+        cache = type(demo.app._render_cache)()
+        monkeypatch.setattr(demo.app, "_render_cache", cache)
+        return size, cache
+
+    def test_non_string_title_is_hashable(self, client, fake_render):
+        resp = client.post("/api/render_static", json={"title": ["a", "list"]})
+        assert resp.status_code == 200
+
+    def test_oversized_output_not_cached(self, client, fake_render, monkeypatch):
+        import demo.app
+
+        size, cache = fake_render
+        monkeypatch.setattr(demo.app, "_RENDER_CACHE_MAX_ITEM_BYTES", 50)
+        size["bytes"] = 51
+        assert client.post("/api/render_static", json={"title": "big"}).status_code == 200
+        assert len(cache) == 0
+
+    def test_total_bytes_bounded(self, client, fake_render, monkeypatch):
+        import demo.app
+
+        size, cache = fake_render
+        monkeypatch.setattr(demo.app, "_RENDER_CACHE_MAX_BYTES", 100)
+        size["bytes"] = 40
+        for n in range(4):
+            client.post("/api/render_static", json={"title": f"t{n}"})
+        # Oldest entries are evicted once the byte budget is exceeded
+        assert sum(map(len, cache.values())) <= 100
+        assert len(cache) == 2
+
+
+@pytest.mark.skipif(
+    not (_HAS_GRAPHVIZ and _HAS_DOT),
+    reason="graphviz package or 'dot' executable not available",
+)
 class TestRenderStaticEndpoint:
     """Test the /api/render_static endpoint (requires graphviz binary)."""
 
-    @pytest.fixture(autouse=True)
-    def check_graphviz(self):
-        pytest.importorskip("graphviz")
-        if not shutil.which("dot"):
-            pytest.skip("Graphviz 'dot' executable not found on PATH")
-
     def test_render_svg(self, client):
         resp = client.post("/api/render_static", json={
             "A": [[0.7, 0.3], [0.4, 0.6]],
@@ -202,3 +403,13 @@ class TestRenderStaticEndpoint:
     def test_render_default_matrix(self, client):
         resp = client.post("/api/render_static", json={})
         assert resp.status_code == 200
+
+    def test_repeat_render_served_from_cache(self, client):
+        from demo.app import _render_cache
+
+        body = {"A": [[0.2, 0.8], [0.9, 0.1]], "title": "Cache check"}
+        first = client.post("/api/render_static", json=body)
+        cached = len(_render_cache)
+        second = client.post("/api/render_static", json=body)
+        assert second.data == first.data
+        assert len(_render_cache) == cached
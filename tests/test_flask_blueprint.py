@@ -6,30 +6,57 @@ Tests for ``state_transition_diagrams.flask_blueprint.create_blueprint``.
 
 from __future__ import annotations
 
-import os
+import gzip
+import importlib.util
+from pathlib import Path
 
 import pytest
 
-flask = pytest.importorskip("flask")
-from flask import Flask
+# find_spec only looks flask up; flask itself is imported in _make_app, so
+# runs that deselect these tests never pay for it
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("flask") is None, reason="flask not installed"
+)
 
-from state_transition_diagrams import create_blueprint
+_STATIC = Path(__file__).resolve().parent.parent / "state_transition_diagrams" / "static"
+_JS_PATH = _STATIC / "js" / "state_diagram.js"
+_CSS_PATH = _STATIC / "css" / "state_diagram.css"
 
 
-@pytest.fixture
-def app():
+def _make_app(mount: str = "/std", **blueprint_kwargs):
     """Create a minimal Flask app with the library blueprint registered."""
+    from flask import Flask
+
+    from state_transition_diagrams import create_blueprint
+
     application = Flask(__name__)
-    application.register_blueprint(create_blueprint(), url_prefix="/std")
+    application.register_blueprint(create_blueprint(**blueprint_kwargs), url_prefix=mount)
     application.config["TESTING"] = True
     return application
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def app():
+    return _make_app()
+
+
+@pytest.fixture(scope="session")
 def client(app):
     return app.test_client()
 
 
+@pytest.fixture(scope="module")
+def js_source():
+    """The library JS, read once for every test in this module."""
+    return _JS_PATH.read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def css_source():
+    """The library CSS, read once for every test in this module."""
+    return _CSS_PATH.read_text(encoding="utf-8")
+
+
 class TestBlueprintRegistration:
     """Blueprint registration and basic serving."""
 
@@ -37,18 +64,11 @@ class TestBlueprintRegistration:
         assert "state_transition_diagrams" in app.blueprints
 
     def test_custom_name(self):
-        application = Flask(__name__)
-        application.register_blueprint(
-            create_blueprint(name="my_diagrams"), url_prefix="/diag"
-        )
+        application = _make_app("/diag", name="my_diagrams")
         assert "my_diagrams" in application.blueprints
 
     def test_custom_url_prefix(self):
-        application = Flask(__name__)
-        application.register_blueprint(
-            create_blueprint(url_prefix="/custom"), url_prefix="/custom"
-        )
-        client = application.test_client()
+        client = _make_app("/custom", url_prefix="/custom").test_client()
         resp = client.get("/custom/js/state_diagram.js")
         assert resp.status_code == 200
 
@@ -82,148 +102,110 @@ class TestStaticAssetServing:
         resp = client.get("/std/js/nonexistent.js")
         assert resp.status_code == 404
 
+    def test_default_cache_is_not_immutable(self, client):
+        resp = client.get("/std/js/state_diagram.js")
+        assert not resp.cache_control.immutable
+        assert resp.cache_control.max_age != 31536000
+        assert "Accept-Encoding" in resp.vary
+
+    def test_long_lived_cache_headers_opt_in(self):
+        app = _make_app(cache_max_age=31536000)
+        resp = app.test_client().get("/std/js/state_diagram.js")
+        assert resp.cache_control.max_age == 31536000
+        assert resp.cache_control.immutable
+
+    @pytest.mark.parametrize("suffix", [".gz", ".br"])
+    def test_compressed_sibling_not_served_directly(self, client, suffix):
+        resp = client.get(f"/std/js/state_diagram.js{suffix}")
+        assert resp.status_code == 404
+
+    def test_identity_without_accept_encoding(self, client):
+        resp = client.get("/std/js/state_diagram.js")
+        assert "Content-Encoding" not in resp.headers
+
+    @pytest.mark.parametrize("asset", ["js/state_diagram.js", "css/state_diagram.css"])
+    def test_gzip_variant_matches_source(self, client, asset):
+        plain = client.get(f"/std/{asset}").data
+        resp = client.get(f"/std/{asset}", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.mimetype == client.get(f"/std/{asset}").mimetype
+        # A stale .gz means the asset was edited without re-compressing it
+        assert gzip.decompress(resp.data) == plain
+
+    def test_path_traversal_404(self, client):
+        resp = client.get("/std/..%2Fconfig.py", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 404
+
 
 class TestStaticFilesExist:
     """Verify the static directory contains expected files."""
 
     def test_static_dir_exists(self):
-        static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
-        assert os.path.isdir(static_dir)
+        assert _STATIC.is_dir()
 
     def test_js_file_on_disk(self):
-        js_path = os.path.join(
-            os.path.dirname(__file__), "..", "static", "js", "state_diagram.js"
-        )
-        assert os.path.isfile(js_path)
+        assert _JS_PATH.is_file()
 
     def test_css_file_on_disk(self):
-        css_path = os.path.join(
-            os.path.dirname(__file__), "..", "static", "css", "state_diagram.css"
-        )
-        assert os.path.isfile(css_path)
+        assert _CSS_PATH.is_file()
+
+
+_JS_API_TOKENS = {
+    "class_declaration": "class StateTransitionDiagram",
+    "hmm_alias": "HMMDiagram",
+    "feed_iteration": "feedIteration",
+    "on_complete": "onComplete",
+    "play": "play(",
+    "pause": "pause(",
+    "step_forward": "stepForward",
+    "step_back": "stepBack",
+    "go_first": "goFirst",
+    "go_last": "goLast",
+    "seek_to": "seekTo",
+    "set_speed": "setSpeed",
+    "toggle_particles": "toggleParticles",
+    "toggle_decongestion": "toggleDecongestion",
+    "toggle_3d": "toggle3D",
+    "wire_controls": "wireControls",
+    "reset": "reset(",
+    "save_svg": "saveSVG",
+    "save_png": "savePNG",
+    "render_inspector": "_renderInspector",
+    "fullscreen_handler": "_handleFullscreenChange",
+}
+
+_CSS_SELECTORS = {
+    "std_canvas": ".std-canvas",
+    "std_controls": ".std-controls",
+    "std_ctrl_btn": ".std-ctrl-btn",
+    "std_speed_select": ".std-speed-select",
+    "std_timeline": ".std-timeline",
+    "std_iter_label": ".std-iter-label",
+    "std_inspector": ".std-inspector",
+    "std_mode_label": ".std-mode-label",
+    "hmm_compat_canvas": ".hmm-canvas",
+    "hmm_compat_controls": ".hmm-controls",
+    "view_3d": ".view-3d",
+    "fullscreen": "fullscreen",
+    "mobile_responsive": "@media",
+}
 
 
 class TestJsFileContents:
     """Verify the JS file contains all expected public API methods."""
 
-    @pytest.fixture(autouse=True)
-    def load_js(self):
-        js_path = os.path.join(
-            os.path.dirname(__file__), "..", "static", "js", "state_diagram.js"
-        )
-        with open(js_path, "r", encoding="utf-8") as f:
-            self.js_source = f.read()
-
-    def test_class_declaration(self):
-        assert "class StateTransitionDiagram" in self.js_source
-
-    def test_hmm_alias(self):
-        assert "HMMDiagram" in self.js_source
-
-    def test_feed_iteration(self):
-        assert "feedIteration" in self.js_source
-
-    def test_on_complete(self):
-        assert "onComplete" in self.js_source
-
-    def test_play(self):
-        assert "play()" in self.js_source or "play(" in self.js_source
-
-    def test_pause(self):
-        assert "pause()" in self.js_source or "pause(" in self.js_source
-
-    def test_step_forward(self):
-        assert "stepForward" in self.js_source
-
-    def test_step_back(self):
-        assert "stepBack" in self.js_source
-
-    def test_go_first(self):
-        assert "goFirst" in self.js_source
-
-    def test_go_last(self):
-        assert "goLast" in self.js_source
-
-    def test_seek_to(self):
-        assert "seekTo" in self.js_source
-
-    def test_set_speed(self):
-        assert "setSpeed" in self.js_source
-
-    def test_toggle_particles(self):
-        assert "toggleParticles" in self.js_source
-
-    def test_toggle_decongestion(self):
-        assert "toggleDecongestion" in self.js_source
-
-    def test_toggle_3d(self):
-        assert "toggle3D" in self.js_source
-
-    def test_wire_controls(self):
-        assert "wireControls" in self.js_source
-
-    def test_reset(self):
-        assert "reset()" in self.js_source or "reset(" in self.js_source
-
-    def test_save_svg(self):
-        assert "saveSVG" in self.js_source
-
-    def test_save_png(self):
-        assert "savePNG" in self.js_source
-
-    def test_render_inspector(self):
-        assert "_renderInspector" in self.js_source
-
-    def test_fullscreen_handler(self):
-        assert "_handleFullscreenChange" in self.js_source
+    @pytest.mark.parametrize(
+        "token", list(_JS_API_TOKENS.values()), ids=list(_JS_API_TOKENS)
+    )
+    def test_contains(self, js_source, token):
+        assert token in js_source
 
 
 class TestCssFileContents:
     """Verify the CSS file contains all expected class selectors."""
 
-    @pytest.fixture(autouse=True)
-    def load_css(self):
-        css_path = os.path.join(
-            os.path.dirname(__file__), "..", "static", "css", "state_diagram.css"
-        )
-        with open(css_path, "r", encoding="utf-8") as f:
-            self.css_source = f.read()
-
-    def test_std_canvas(self):
-        assert ".std-canvas" in self.css_source
-
-    def test_std_controls(self):
-        assert ".std-controls" in self.css_source
-
-    def test_std_ctrl_btn(self):
-        assert ".std-ctrl-btn" in self.css_source
-
-    def test_std_speed_select(self):
-        assert ".std-speed-select" in self.css_source
-
-    def test_std_timeline(self):
-        assert ".std-timeline" in self.css_source
-
-    def test_std_iter_label(self):
-        assert ".std-iter-label" in self.css_source
-
-    def test_std_inspector(self):
-        assert ".std-inspector" in self.css_source
-
-    def test_std_mode_label(self):
-        assert ".std-mode-label" in self.css_source
-
-    def test_hmm_compat_canvas(self):
-        assert ".hmm-canvas" in self.css_source
-
-    def test_hmm_compat_controls(self):
-        assert ".hmm-controls" in self.css_source
-
-    def test_view_3d(self):
-        assert ".view-3d" in self.css_source
-
-    def test_fullscreen(self):
-        assert "fullscreen" in self.css_source
-
-    def test_mobile_responsive(self):
-        assert "@media" in self.css_source
+    @pytest.mark.parametrize(
+        "selector", list(_CSS_SELECTORS.values()), ids=list(_CSS_SELECTORS)
+    )
+    def test_contains(self, css_source, selector):
+        assert selector in css_source
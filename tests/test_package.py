@@ -6,6 +6,10 @@ Tests for package-level imports and metadata.
 
 from __future__ import annotations
 
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
 
@@ -28,6 +32,22 @@ class TestPackageImports:
         from state_transition_diagrams import create_blueprint
         assert callable(create_blueprint)
 
+    def test_heavy_dependencies_imported_lazily(self):
+        code = (
+            "import sys, state_transition_diagrams; "
+            "assert not {'flask', 'graphviz', 'numpy'} & set(sys.modules)"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+
+    def test_unknown_attribute_raises(self):
+        import state_transition_diagrams
+        with pytest.raises(AttributeError):
+            state_transition_diagrams.does_not_exist
+
     def test_version_string(self):
         from state_transition_diagrams import __version__
         assert isinstance(__version__, str)
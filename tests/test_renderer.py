@@ -6,8 +6,8 @@ Tests for ``state_transition_diagrams.renderer.render_state_diagram``.
 
 from __future__ import annotations
 
+import importlib.util
 import shutil
-import tempfile
 from pathlib import Path
 
 import numpy as np
@@ -15,10 +15,19 @@ import pytest
 
 from state_transition_diagrams.config import DiagramConfig
 
-# graphviz may not be installed — skip tests gracefully
-graphviz = pytest.importorskip("graphviz")
+# graphviz may not be installed — skip tests gracefully.  It is only
+# imported by _render and the tests themselves, so deselected runs skip it.
+pytestmark = pytest.mark.skipif(
+    importlib.util.find_spec("graphviz") is None, reason="graphviz not installed"
+)
+
+
+def _render(A, **kwargs):
+    """Call ``render_state_diagram``, importing the renderer on first use."""
+    from state_transition_diagrams.renderer import render_state_diagram
+
+    return render_state_diagram(A, **kwargs)
 
-from state_transition_diagrams.renderer import render_state_diagram
 
 # The Python graphviz package can be installed while the system
 # Graphviz binaries (dot, neato, …) are absent.  Tests that need to
@@ -30,53 +39,90 @@ needs_dot = pytest.mark.skipif(
 )
 
 
-@pytest.fixture
+def _frozen(A):
+    """Make a shared fixture array read-only so no test can mutate it."""
+    A.setflags(write=False)
+    return A
+
+
+@pytest.fixture(scope="module")
 def simple_A():
-    return np.array([[0.7, 0.3], [0.4, 0.6]])
+    return _frozen(np.array([[0.7, 0.3], [0.4, 0.6]]))
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def three_state_A():
-    return np.array([
+    return _frozen(np.array([
         [0.5, 0.3, 0.2],
         [0.1, 0.7, 0.2],
         [0.3, 0.3, 0.4],
-    ])
+    ]))
+
+
+@pytest.fixture(scope="module")
+def near_diagonal_A():
+    return _frozen(np.array([[0.95, 0.05], [0.02, 0.98]]))
+
+
+@pytest.fixture(scope="module")
+def default_dot(simple_A):
+    """``simple_A`` rendered with the default config, shared by read-only tests.
+
+    Tests must not mutate the returned ``Digraph`` (``attr``, ``node``, …).
+    """
+    return _render(simple_A)
+
+
+@pytest.fixture(scope="module")
+def large_A():
+    rng = np.random.default_rng(42)
+    return _frozen(rng.dirichlet(np.ones(10), size=10))
 
 
 class TestRenderBasic:
     """Basic rendering without saving."""
 
-    def test_returns_digraph(self, simple_A):
-        dot = render_state_diagram(simple_A)
-        assert isinstance(dot, graphviz.Digraph)
+    def test_returns_digraph(self, default_dot):
+        import graphviz
 
-    def test_graph_name(self, simple_A):
-        dot = render_state_diagram(simple_A)
-        assert dot.name == "StateDiagram"
+        assert isinstance(default_dot, graphviz.Digraph)
 
-    def test_default_format_svg(self, simple_A):
-        dot = render_state_diagram(simple_A)
-        assert dot.format == "svg"
+    def test_graph_name(self, default_dot):
+        assert default_dot.name == "StateDiagram"
 
-    def test_default_engine_circo(self, simple_A):
-        dot = render_state_diagram(simple_A)
-        assert dot.engine == "circo"
+    def test_default_format_svg(self, default_dot):
+        assert default_dot.format == "svg"
 
-    def test_default_labels(self, simple_A):
-        dot = render_state_diagram(simple_A)
-        source = dot.source
+    def test_default_engine_circo(self, default_dot):
+        assert default_dot.engine == "circo"
+
+    def test_default_labels(self, default_dot):
+        source = default_dot.source
         assert "S0" in source
         assert "S1" in source
 
     def test_custom_labels(self, simple_A):
-        dot = render_state_diagram(simple_A, state_labels=["Rainy", "Sunny"])
+        dot = _render(simple_A, state_labels=["Rainy", "Sunny"])
         source = dot.source
         assert "Rainy" in source
         assert "Sunny" in source
 
+    def test_shared_node_attributes_emitted_once(self, three_state_A):
+        source = _render(three_state_A).source
+        assert source.count("style=filled") == 1
+        assert source.count("fixedsize=true") == 1
+
+    def test_shared_attributes_scoped_to_states(self, simple_A):
+        dot = _render(simple_A)
+        dot.node("note", shape="box")
+        lines = [line.strip() for line in dot.source.splitlines()]
+        close = lines.index("}")
+        # The style defaults live inside the state subgraph, before its brace
+        assert any(line.startswith("node [") for line in lines[:close])
+        assert lines.index("note [shape=box]") > close
+
     def test_three_state(self, three_state_A):
-        dot = render_state_diagram(three_state_A, state_labels=["A", "B", "C"])
+        dot = _render(three_state_A, state_labels=["A", "B", "C"])
         source = dot.source
         for label in ("A", "B", "C"):
             assert label in source
@@ -86,101 +132,92 @@ class TestRenderWithConfig:
     """Rendering with custom DiagramConfig."""
 
     def test_custom_format_png(self, simple_A):
-        dot = render_state_diagram(simple_A, fmt="png")
+        dot = _render(simple_A, fmt="png")
         assert dot.format == "png"
 
     def test_custom_format_pdf(self, simple_A):
-        dot = render_state_diagram(simple_A, fmt="pdf")
+        dot = _render(simple_A, fmt="pdf")
         assert dot.format == "pdf"
 
     def test_format_override_takes_precedence(self, simple_A):
         cfg = DiagramConfig(output_format="pdf")
-        dot = render_state_diagram(simple_A, config=cfg, fmt="png")
+        dot = _render(simple_A, config=cfg, fmt="png")
         assert dot.format == "png"
 
     def test_config_layout_engine(self, simple_A):
         cfg = DiagramConfig(layout_engine="dot")
-        dot = render_state_diagram(simple_A, config=cfg)
+        dot = _render(simple_A, config=cfg)
         assert dot.engine == "dot"
 
     def test_config_title(self, simple_A):
-        dot = render_state_diagram(simple_A, title="My Custom Title")
+        dot = _render(simple_A, title="My Custom Title")
         assert "My Custom Title" in dot.source
 
     def test_config_background_color(self, simple_A):
         cfg = DiagramConfig(background_color="#FFFFFF")
-        dot = render_state_diagram(simple_A, config=cfg)
+        dot = _render(simple_A, config=cfg)
         assert "#FFFFFF" in dot.source
 
     def test_custom_state_colors(self, simple_A):
         cfg = DiagramConfig(state_colors=["#E74C3C", "#3498DB"])
-        dot = render_state_diagram(simple_A, config=cfg)
+        dot = _render(simple_A, config=cfg)
         assert "#E74C3C" in dot.source
         assert "#3498DB" in dot.source
 
     def test_config_node_shape(self, simple_A):
         cfg = DiagramConfig(node_shape="doublecircle")
-        dot = render_state_diagram(simple_A, config=cfg)
+        dot = _render(simple_A, config=cfg)
         assert "doublecircle" in dot.source
 
     def test_config_font_family(self, simple_A):
         cfg = DiagramConfig(font_family="Arial")
-        dot = render_state_diagram(simple_A, config=cfg)
+        dot = _render(simple_A, config=cfg)
         assert "Arial" in dot.source
 
 
+def _edge_count(A, *, prob_threshold=None, config=None):
+    """Number of edges in the DOT source rendered for ``A``."""
+    dot = _render(A, config=config, prob_threshold=prob_threshold)
+    return dot.source.count("->")
+
+
 class TestRenderProbThreshold:
     """Edge suppression via prob_threshold."""
 
-    def test_low_threshold_includes_all_edges(self, simple_A):
-        dot = render_state_diagram(simple_A, prob_threshold=0.0)
-        source = dot.source
-        # 2×2 matrix with all values > 0 → 4 edges
-        assert source.count("->") == 4
-
-    def test_high_threshold_suppresses_edges(self):
-        A = np.array([[0.95, 0.05], [0.02, 0.98]])
-        dot = render_state_diagram(A, prob_threshold=0.1)
-        source = dot.source
-        # Only self-loops (0.95 and 0.98) should remain
-        assert source.count("->") == 2
+    @pytest.mark.parametrize(
+        ("threshold", "expected_edges"),
+        [(0.0, 4), (0.1, 2), (0.5, 2)],
+        ids=["all_edges", "self_loops_only", "high"],
+    )
+    def test_threshold_param(self, near_diagonal_A, threshold, expected_edges):
+        # Off-diagonal entries are 0.05 and 0.02, the self-loops 0.95 and 0.98
+        assert _edge_count(near_diagonal_A, prob_threshold=threshold) == expected_edges
 
-    def test_threshold_from_config(self):
-        A = np.array([[0.95, 0.05], [0.02, 0.98]])
+    def test_threshold_from_config(self, near_diagonal_A):
         cfg = DiagramConfig(prob_threshold=0.5)
-        dot = render_state_diagram(A, config=cfg)
-        source = dot.source
-        assert source.count("->") == 2
+        assert _edge_count(near_diagonal_A, config=cfg) == 2
 
-    def test_threshold_param_overrides_config(self):
-        A = np.array([[0.95, 0.05], [0.02, 0.98]])
+    def test_threshold_param_overrides_config(self, near_diagonal_A):
         cfg = DiagramConfig(prob_threshold=0.001)
-        dot = render_state_diagram(A, config=cfg, prob_threshold=0.5)
-        source = dot.source
-        assert source.count("->") == 2
+        assert _edge_count(near_diagonal_A, config=cfg, prob_threshold=0.5) == 2
 
 
 @needs_dot
 class TestRenderSaveToFile:
     """Rendering to disk."""
 
-    def test_save_svg(self, simple_A):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            save_path = Path(tmpdir) / "test_diagram"
-            render_state_diagram(simple_A, save_path=save_path)
-            assert (Path(tmpdir) / "test_diagram.svg").exists()
+    def test_save_svg(self, simple_A, tmp_path):
+        _render(simple_A, save_path=tmp_path / "test_diagram")
+        assert (tmp_path / "test_diagram.svg").exists()
 
-    def test_save_png(self, simple_A):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            save_path = Path(tmpdir) / "test_diagram"
-            render_state_diagram(simple_A, save_path=save_path, fmt="png")
-            assert (Path(tmpdir) / "test_diagram.png").exists()
+    def test_save_png(self, simple_A, tmp_path):
+        _render(simple_A, save_path=tmp_path / "test_diagram", fmt="png")
+        assert (tmp_path / "test_diagram.png").exists()
 
-    def test_save_path_as_string(self, simple_A):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            save_path = str(Path(tmpdir) / "from_string")
-            render_state_diagram(simple_A, save_path=save_path)
-            assert Path(save_path + ".svg").exists()
+    def test_save_path_as_string(self, simple_A, tmp_path):
+        save_path = str(tmp_path / "from_string")
+        _render(simple_A, save_path=save_path)
+        assert Path(save_path + ".svg").exists()
 
 
 class TestRenderEdgeCases:
@@ -188,15 +225,12 @@ class TestRenderEdgeCases:
 
     def test_single_state(self):
         A = np.array([[1.0]])
-        dot = render_state_diagram(A)
+        dot = _render(A)
         assert "S0" in dot.source
 
-    def test_large_matrix(self):
-        rng = np.random.default_rng(42)
-        N = 10
-        A = rng.dirichlet(np.ones(N), size=N)
-        dot = render_state_diagram(A)
-        for i in range(N):
+    def test_large_matrix(self, large_A):
+        dot = _render(large_A)
+        for i in range(len(large_A)):
             assert f"S{i}" in dot.source
 
     def test_sparse_matrix(self):
@@ -205,19 +239,31 @@ class TestRenderEdgeCases:
             [0.0, 1.0, 0.0],
             [0.0, 0.0, 1.0],
         ])
-        dot = render_state_diagram(A)
-        source = dot.source
         # Only 3 self-loops
-        assert source.count("->") == 3
+        assert _edge_count(A) == 3
+
+    def test_extra_columns_ignored(self):
+        A = np.array([
+            [0.5, 0.3, 0.2],
+            [0.1, 0.6, 0.3],
+        ])
+        dot = _render(A, prob_threshold=0.0)
+        # Only transitions between the two declared states are drawn
+        assert dot.source.count("->") == 4
+        assert "-> 2" not in dot.source
 
     def test_zero_matrix(self):
+        import graphviz
+
         A = np.zeros((3, 3))
-        dot = render_state_diagram(A, prob_threshold=0.0)
+        dot = _render(A, prob_threshold=0.0)
         # No edges at all when all probabilities are 0 and max_prob fallback is 1
         assert isinstance(dot, graphviz.Digraph)
 
     def test_labels_cycling_when_fewer_colours(self):
+        import graphviz
+
         A = np.eye(5)
         cfg = DiagramConfig(state_colors=["#AA0000", "#00BB00"])
-        dot = render_state_diagram(A, config=cfg)
+        dot = _render(A, config=cfg)
         assert isinstance(dot, graphviz.Digraph)